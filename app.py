@@ -1,9 +1,31 @@
 import streamlit as st
+import io
 import json
 import re
 from datetime import datetime
+from functools import lru_cache
 from urllib.parse import unquote
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Response headers whose value is a URL
+_URL_RESPONSE_HEADERS = frozenset({'location', 'content-location', 'link'})
+
+# Response bodies that can't contain text URLs
+_BINARY_MIME_MAJOR = frozenset({'image', 'video', 'audio', 'font'})
+_BINARY_MIME_TYPES = frozenset({
+    'application/pdf',
+    'application/octet-stream',
+    'application/zip',
+    'application/wasm',
+})
+
+# Larger bodies are skipped unless "Scan very large bodies" is on
+_MAX_BODY_SCAN_CHARS = 5_000_000
+
 # ─────────────────────────────────────────────
 # Page Config
 # ─────────────────────────────────────────────
@@ -22,11 +44,69 @@ if 'filtered_links' not in st.session_state:
     st.session_state.filtered_links = []
 if 'har_loaded' not in st.session_state:
     st.session_state.har_loaded = False
+if 'raw_links_lower' not in st.session_state:
+    st.session_state.raw_links_lower = []
+if 'cleaned_map' not in st.session_state:
+    st.session_state.cleaned_map = {}
+if 'har_file_id' not in st.session_state:
+    st.session_state.har_file_id = None
+
+
+# ─────────────────────────────────────────────
+# Compiled Patterns
+# ─────────────────────────────────────────────
+# Plain URLs (headers, POST data, JS bodies)
+_RX_URL = re.compile(r'https?://[^\s"\'<>\\,;]+')
+# Loose URLs in HTML / plain text / XML
+_RX_URL_RAW = re.compile(r'https?://[^\s"\'<>]+')
+# Escaped URLs like https:\/\/domain.com\/path
+_RX_URL_ESC = re.compile(r'https?:\\?/\\?/[^\s"\'<>,;]+')
+# JSON bodies: same as above, but also stop at ] } )
+_RX_JSON_URL = re.compile(r'https?://[^\s"\'<>\\,;\]})]+')
+_RX_JSON_URL_ESC = re.compile(r'https?:\\?/\\?/[^\s"\'<>,;\]})]+')
+# Double-escaped https:\\/\\/domain.com\\/path
+_RX_JSON_URL_DBL = re.compile(r'https?:\\{1,4}/\\{0,4}/[^\s"\'<>,;\]})]+')
+# href="..." / src="..." style attributes
+_RX_HTML_ATTR = re.compile(
+    r'(?:href|src|data-href|data-src|data-url|action)'
+    r'\s*=\s*["\']([^"\']+)["\']',
+    re.IGNORECASE
+)
+# URLs as the only text of td/span/div/p/li
+_RX_TD = re.compile(
+    r'<(?:td|span|div|p|li)[^>]*>\s*'
+    r'(https?://[^\s<]+)\s*'
+    r'</(?:td|span|div|p|li)>',
+    re.IGNORECASE
+)
+# Body that starts like a JSON document
+_RX_JSON_START = re.compile(r'\s*[{\[]')
+# Used by clean_url
+_RX_ESCAPE_NOISE = re.compile(r'\\["nrt]')
+_RX_BACKSLASH_SLASH = re.compile(r'\\+/')
+_RX_COLLAPSE_SLASH = re.compile(r'(?<!:)/{2,}')
 
 
 # ─────────────────────────────────────────────
 # CORE: Clean a URL
 # ─────────────────────────────────────────────
+def is_clean_url(url):
+    """
+    True if clean_url() would return this (stripped) URL as is:
+    plain http(s), no escapes, no %-encoding, no fragment, no
+    doubled slashes and no trailing garbage.
+    """
+    return (
+        url.startswith(('http://', 'https://'))
+        and '\\' not in url
+        and '%2F' not in url and '%3A' not in url
+        and '#' not in url
+        and url.find('//', url.index(':') + 2) == -1
+        and url[-1] not in '",;\')}'
+    )
+
+
+@lru_cache(maxsize=200_000)
 def clean_url(url):
     """
     Fix broken URLs found in HAR files.
@@ -44,26 +124,22 @@ def clean_url(url):
 
     cleaned = url.strip()
 
+    # Fast path: most request URLs are already clean
+    if is_clean_url(cleaned):
+        return cleaned
+
     # Remove surrounding quotes
     cleaned = cleaned.strip('"\'')
     cleaned = cleaned.strip('\\')
 
-    # Fix escaped slashes (multiple passes for nested escaping)
-    # \\/ → /
-    # \/ → /
-    for _ in range(5):
-        old = cleaned
-        cleaned = cleaned.replace('\\/', '/')
-        cleaned = cleaned.replace('\\\\/', '/')
-        cleaned = cleaned.replace('\\"', '')
-        cleaned = cleaned.replace('\\n', '')
-        cleaned = cleaned.replace('\\r', '')
-        cleaned = cleaned.replace('\\t', '')
-        if cleaned == old:
-            break
-
-    # Fix double-escaped backslashes
-    cleaned = re.sub(r'\\+/', '/', cleaned)
+    # Drop escape noise: \" \n \r \t
+    if '\\' in cleaned:
+        cleaned = _RX_ESCAPE_NOISE.sub('', cleaned)
+
+        # Fix escaped slashes at any depth in one pass
+        # \\/ → /
+        # \/ → /
+        cleaned = _RX_BACKSLASH_SLASH.sub('/', cleaned)
 
     # URL decode if needed
     if '%2F' in cleaned or '%3A' in cleaned:
@@ -83,7 +159,7 @@ def clean_url(url):
     cleaned = cleaned.replace('\\', '/')
 
     # Fix triple slashes (but keep ://)
-    cleaned = re.sub(r'(?<!:)/{2,}', '/', cleaned)
+    cleaned = _RX_COLLAPSE_SLASH.sub('/', cleaned)
 
     # Remove trailing garbage characters
     cleaned = cleaned.rstrip('\\",;\')} \t\n\r')
@@ -95,12 +171,172 @@ def clean_url(url):
     return cleaned
 
 
+def clean_urls(urls):
+    """
+    clean_url() for a whole list, same results in the same order.
+
+    URLs that are already clean are passed straight through
+    without a cache lookup.
+    """
+    results = []
+    for url in urls:
+        stripped = url.strip()
+        if is_clean_url(stripped):
+            results.append(stripped)
+        else:
+            results.append(clean_url(url))
+    return results
+
+
 # ─────────────────────────────────────────────
 # CORE: Extract ALL URLs from HAR
 # ─────────────────────────────────────────────
-def extract_all_urls_from_har(har_content):
+def scan_json_body(body_text, all_urls):
+    """JSON bodies: normal, escaped and double-escaped URLs."""
+    # Separate passes, not one alternation: the escaped pattern
+    # also matches plain URLs and runs on past a backslash, so an
+    # alternation would lose the plain URL before an escaped \n
+    # or \u0026
+    all_urls.update(_RX_JSON_URL.findall(body_text))
+    all_urls.update(_RX_JSON_URL_ESC.findall(body_text))
+    all_urls.update(_RX_JSON_URL_DBL.findall(body_text))
+
+
+def scan_js_body(body_text, all_urls):
+    """JavaScript bodies: normal and escaped URLs."""
+    all_urls.update(_RX_URL.findall(body_text))
+    all_urls.update(_RX_URL_ESC.findall(body_text))
+
+
+def scan_text_body(body_text, all_urls):
+    """Plain-text / XML bodies: loose URLs."""
+    all_urls.update(_RX_URL_RAW.findall(body_text))
+
+
+def scan_html_body(body_text, all_urls):
+    """HTML bodies: attributes, raw URLs and tag-only URL text."""
+    # href="..." and src="..."
+    found = _RX_HTML_ATTR.findall(body_text)
+    for f in found:
+        if f.startswith('http'):
+            all_urls.add(f)
+
+    # Also raw URL patterns
+    found_raw = _RX_URL_RAW.findall(body_text)
+    all_urls.update(found_raw)
+
+    # td values, span content, div content
+    # with PDF links
+    found_td = _RX_TD.findall(body_text)
+    all_urls.update(found_td)
+
+
+# mimeType substring → body scanner, first match wins;
+# anything else is scanned as plain text
+_MIME_HANDLERS = (
+    ('json', scan_json_body),
+    ('html', scan_html_body),
+    ('script', scan_js_body),
+)
+
+
+def load_har_json(har_bytes):
+    """Parse a whole HAR file. Raises ValueError if it isn't JSON."""
+    if orjson is not None:
+        # orjson parses bytes directly and is several times faster
+        try:
+            return orjson.loads(har_bytes)
+        except ValueError:
+            # It is also stricter (invalid UTF-8, lone surrogate
+            # escapes); let json decide, as it always did
+            pass
+    return json.loads(har_bytes.decode('utf-8', errors='ignore'))
+
+
+def collect_entry_urls(entry, all_urls, scan_large_bodies=False):
+    """
+    Add every URL found in one HAR entry to the all_urls set.
+
+    Response bodies over _MAX_BODY_SCAN_CHARS are skipped unless
+    scan_large_bodies is set.
+    """
+    # ── 1. Request URL ──
+    request = entry.get('request', {})
+    req_url = request.get('url', '')
+    if req_url:
+        all_urls.add(req_url)
+
+    # ── 2. Request headers ──
+    for header in request.get('headers', []):
+        val = header.get('value', '')
+        # _RX_URL is case-sensitive, so no need to lower() first
+        if 'http' in val:
+            # Extract URLs from header values
+            found = _RX_URL.findall(val)
+            all_urls.update(found)
+
+    # ── 3. Request POST data ──
+    post_data = request.get('postData', {})
+    post_text = post_data.get('text', '')
+    if post_text:
+        found = _RX_URL.findall(post_text)
+        all_urls.update(found)
+
+        # Also check for escaped URLs in POST
+        found_escaped = _RX_URL_ESC.findall(post_text)
+        all_urls.update(found_escaped)
+
+    # ── 4. Response headers ──
+    response = entry.get('response', {})
+    for header in response.get('headers', []):
+        name = header.get('name', '').lower()
+        val = header.get('value', '')
+
+        if name in _URL_RESPONSE_HEADERS:
+            if 'http' in val:
+                all_urls.add(val)
+
+        if name == 'content-disposition' and 'filename' in val:
+            # Not a URL but useful info
+            pass
+
+    # ── 5. Response body ──
+    content = response.get('content', {})
+    body_text = content.get('text', '')
+
+    if body_text:
+        mime = content.get('mimeType', '').lower()
+
+        # Binary / base64 bodies can't hold text URLs, and huge
+        # bodies are almost always embedded blobs
+        if (
+            content.get('encoding') == 'base64'
+            or mime.split('/', 1)[0] in _BINARY_MIME_MAJOR
+            or mime.partition(';')[0].strip() in _BINARY_MIME_TYPES
+            or (len(body_text) > _MAX_BODY_SCAN_CHARS
+                and not scan_large_bodies)
+        ):
+            return
+
+        # Bodies that look like JSON are scanned as JSON whatever
+        # their mimeType says (no full-body strip just to peek)
+        if _RX_JSON_START.match(body_text):
+            scan_body = scan_json_body
+        else:
+            scan_body = next(
+                (h for key, h in _MIME_HANDLERS if key in mime),
+                scan_text_body
+            )
+        scan_body(body_text, all_urls)
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def extract_all_urls_from_har(har_bytes, scan_large_bodies=False):
     """
     Extract every possible URL from a HAR file.
+
+    Takes the raw uploaded bytes so Streamlit can cache the
+    result per file across reruns.
     
     Searches in:
     1. Request URLs (entries[].request.url)
@@ -113,8 +349,8 @@ def extract_all_urls_from_har(har_content):
     all_urls = set()
 
     try:
-        har_data = json.loads(har_content)
-    except json.JSONDecodeError as e:
+        har_data = load_har_json(har_bytes)
+    except ValueError as e:
         st.error(f"Invalid HAR file: {e}")
         return []
 
@@ -125,148 +361,39 @@ def extract_all_urls_from_har(har_content):
         return []
 
     for entry in entries:
-        # ── 1. Request URL ──
-        request = entry.get('request', {})
-        req_url = request.get('url', '')
-        if req_url:
-            all_urls.add(req_url)
-
-        # ── 2. Request headers ──
-        for header in request.get('headers', []):
-            val = header.get('value', '')
-            if 'http' in val.lower():
-                # Extract URLs from header values
-                found = re.findall(
-                    r'https?://[^\s"\'<>\\,;]+',
-                    val
-                )
-                all_urls.update(found)
-
-        # ── 3. Request POST data ──
-        post_data = request.get('postData', {})
-        post_text = post_data.get('text', '')
-        if post_text:
-            found = re.findall(
-                r'https?://[^\s"\'<>\\,;]+',
-                post_text
-            )
-            all_urls.update(found)
+        collect_entry_urls(entry, all_urls, scan_large_bodies)
 
-            # Also check for escaped URLs in POST
-            found_escaped = re.findall(
-                r'https?:\\?/\\?/[^\s"\'<>,;]+',
-                post_text
-            )
-            all_urls.update(found_escaped)
-
-        # ── 4. Response headers ──
-        response = entry.get('response', {})
-        for header in response.get('headers', []):
-            name = header.get('name', '').lower()
-            val = header.get('value', '')
-
-            if name in ['location', 'content-location', 'link']:
-                if 'http' in val:
-                    all_urls.add(val)
-
-            if name == 'content-disposition' and 'filename' in val:
-                # Not a URL but useful info
-                pass
-
-        # ── 5. Response body ──
-        content = response.get('content', {})
-        body_text = content.get('text', '')
-
-        if body_text:
-            mime = content.get('mimeType', '').lower()
-
-            # JSON responses
-            if 'json' in mime or body_text.strip().startswith(('{', '[')):
-                # Find URLs in JSON (handles escaped slashes)
-                # Pattern for normal URLs
-                found = re.findall(
-                    r'https?://[^\s"\'<>\\,;\]})]+',
-                    body_text
-                )
-                all_urls.update(found)
+    return list(all_urls)
 
-                # Pattern for escaped URLs like
-                # https:\/\/domain.com\/path
-                found_escaped = re.findall(
-                    r'https?:\\?/\\?/[^\s"\'<>,;\]})]+',
-                    body_text
-                )
-                all_urls.update(found_escaped)
 
-                # Pattern for double-escaped
-                # https:\\/\\/domain.com\\/path
-                found_double = re.findall(
-                    r'https?:\\{1,4}/\\{0,4}/[^\s"\'<>,;\]})]+',
-                    body_text
-                )
-                all_urls.update(found_double)
-
-            # HTML responses
-            elif 'html' in mime:
-                # href="..." and src="..."
-                found = re.findall(
-                    r'(?:href|src|data-href|data-src|data-url|action)'
-                    r'\s*=\s*["\']([^"\']+)["\']',
-                    body_text,
-                    re.IGNORECASE
-                )
-                for f in found:
-                    if f.startswith('http'):
-                        all_urls.add(f)
-
-                # Also raw URL patterns
-                found_raw = re.findall(
-                    r'https?://[^\s"\'<>]+',
-                    body_text
-                )
-                all_urls.update(found_raw)
-
-                # td values, span content, div content
-                # with PDF links
-                found_td = re.findall(
-                    r'<(?:td|span|div|p|li)[^>]*>\s*'
-                    r'(https?://[^\s<]+)\s*'
-                    r'</(?:td|span|div|p|li)>',
-                    body_text,
-                    re.IGNORECASE
-                )
-                all_urls.update(found_td)
+# ─────────────────────────────────────────────
+# CORE: Filter URLs by Keywords
+# ─────────────────────────────────────────────
+def parse_keywords(text):
+    """Split a `|`-separated keyword box into a tuple."""
+    return tuple(kw.strip() for kw in text.split('|') if kw.strip())
 
-            # JavaScript responses
-            elif 'javascript' in mime or 'script' in mime:
-                found = re.findall(
-                    r'https?://[^\s"\'<>\\,;]+',
-                    body_text
-                )
-                all_urls.update(found)
 
-                found_escaped = re.findall(
-                    r'https?:\\?/\\?/[^\s"\'<>,;]+',
-                    body_text
-                )
-                all_urls.update(found_escaped)
+def make_filename(url):
+    """Last path segment of a URL without its query string."""
+    return url.rsplit('/', 1)[-1].partition('?')[0]
 
-            # Plain text / XML
-            else:
-                found = re.findall(
-                    r'https?://[^\s"\'<>]+',
-                    body_text
-                )
-                all_urls.update(found)
 
-    return list(all_urls)
+def compile_keywords(keywords):
+    """
+    Compile lowercase keywords into one literal alternation.
+
+    No capture groups: they roughly halve search speed by
+    disabling sre's literal optimizations. Returns None for an
+    empty list (an empty pattern would match every URL).
+    """
+    if not keywords:
+        return None
+    return re.compile('|'.join(map(re.escape, keywords)))
 
 
-# ─────────────────────────────────────────────
-# CORE: Filter URLs by Keywords
-# ─────────────────────────────────────────────
 def filter_urls(all_urls, include_keywords, exclude_keywords,
-                custom_xpath_keywords=None):
+                custom_xpath_keywords=None, cleaned_map=None):
     """
     Filter URLs based on include/exclude keywords.
 
@@ -278,12 +405,13 @@ def filter_urls(all_urls, include_keywords, exclude_keywords,
                           URL must NOT contain any
         custom_xpath_keywords: additional keywords to look
                                for in URL path/params
+        cleaned_map: optional {raw_url: clean_url(raw_url)}
+                     computed once after extraction
 
     Returns:
-        list of (cleaned_url, matched_keyword)
+        list of (cleaned_url, matched_keyword, filename)
     """
     results = []
-    seen = set()
 
     # Combine include keywords
     all_include = [
@@ -305,40 +433,41 @@ def filter_urls(all_urls, include_keywords, exclude_keywords,
         if kw.strip()
     ]
 
-    for raw_url in all_urls:
-        # Clean the URL first
-        cleaned = clean_url(raw_url)
-        if not cleaned:
-            continue
-
+    # One compiled alternation per side instead of a
+    # Python-level `in` test per keyword per URL
+    include_rx = compile_keywords(all_include)
+    exclude_rx = compile_keywords(all_exclude)
+    if include_rx is None:
+        return results
+
+    # Clean first, then dedupe: escaped and unescaped copies
+    # of the same URL collapse to one entry before matching
+    if cleaned_map is None:
+        unique_urls = set(clean_urls(all_urls))
+    else:
+        unique_urls = {cleaned_map[u] for u in all_urls}
+    unique_urls.discard("")
+
+    for cleaned in unique_urls:
         cleaned_lower = cleaned.lower()
 
-        # Skip if already seen
-        if cleaned in seen:
-            continue
-
         # ── EXCLUDE CHECK ──
-        excluded = False
-        for exc in all_exclude:
-            if exc in cleaned_lower:
-                excluded = True
-                break
-        if excluded:
+        if exclude_rx and exclude_rx.search(cleaned_lower):
             continue
 
         # ── INCLUDE CHECK ──
-        matched_kw = None
-        for inc in all_include:
-            if inc in cleaned_lower:
-                matched_kw = inc
-                break
-
-        if matched_kw:
-            seen.add(cleaned)
-            results.append((cleaned, matched_kw))
+        if include_rx.search(cleaned_lower):
+            # Report the first keyword in list order (Include
+            # before Custom), not the leftmost one in the URL
+            matched_kw = next(
+                kw for kw in all_include if kw in cleaned_lower
+            )
+            results.append(
+                (cleaned, matched_kw, make_filename(cleaned))
+            )
 
     # Sort by filename
-    results.sort(key=lambda x: x[0].split('/')[-1].lower())
+    results.sort(key=lambda x: x[0].rsplit('/', 1)[-1].lower())
 
     return results
 
@@ -349,43 +478,44 @@ def filter_urls(all_urls, include_keywords, exclude_keywords,
 def generate_txt(filtered_results, source_file, include_kw,
                  exclude_kw, custom_kw):
     """Generate clean .txt output"""
-    lines = []
-    lines.append("=" * 70)
-    lines.append("PDF LINKS EXTRACTED FROM HAR FILE")
-    lines.append("=" * 70)
-    lines.append(f"Source File    : {source_file}")
-    lines.append(
+    buf = io.StringIO()
+    w = buf.write
+    w("=" * 70 + "\n")
+    w("PDF LINKS EXTRACTED FROM HAR FILE\n")
+    w("=" * 70 + "\n")
+    w(f"Source File    : {source_file}\n")
+    w(
         f"Extracted On   : "
-        f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+        f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
     )
-    lines.append(f"Total PDFs     : {len(filtered_results)}")
-    lines.append(f"Include Filter : {', '.join(include_kw)}")
+    w(f"Total PDFs     : {len(filtered_results)}\n")
+    w(f"Include Filter : {', '.join(include_kw)}\n")
     if custom_kw:
-        lines.append(f"Custom Keywords: {', '.join(custom_kw)}")
-    lines.append(f"Exclude Count  : {len(exclude_kw)} patterns")
-    lines.append("=" * 70)
-    lines.append("")
-    lines.append("── PDF LINKS ──")
-    lines.append("")
-
-    for i, (url, keyword) in enumerate(filtered_results, 1):
-        filename = url.split('/')[-1].split('?')[0]
-        lines.append(f"{i:4d}. {filename}")
-        lines.append(f"      {url}")
-        lines.append(f"      [matched: {keyword}]")
-        lines.append("")
-
-    lines.append("=" * 70)
-    lines.append("")
-    lines.append("── PLAIN URL LIST (copy-paste ready) ──")
-    lines.append("")
-    for url, _ in filtered_results:
-        lines.append(url)
-
-    lines.append("")
-    lines.append("=" * 70)
-    lines.append("END")
-    return "\n".join(lines)
+        w(f"Custom Keywords: {', '.join(custom_kw)}\n")
+    w(f"Exclude Count  : {len(exclude_kw)} patterns\n")
+    w("=" * 70 + "\n")
+    w("\n")
+    w("── PDF LINKS ──\n")
+    w("\n")
+
+    for i, (url, keyword, filename) in enumerate(filtered_results, 1):
+        w(f"{i:4d}. {filename}\n")
+        w(f"      {url}\n")
+        w(f"      [matched: {keyword}]\n")
+        w("\n")
+
+    w("=" * 70 + "\n")
+    w("\n")
+    w("── PLAIN URL LIST (copy-paste ready) ──\n")
+    w("\n")
+    for url, _, _ in filtered_results:
+        w(url)
+        w("\n")
+
+    w("\n")
+    w("=" * 70 + "\n")
+    w("END")
+    return buf.getvalue()
 
 
 # ═════════════════════════════════════════════
@@ -435,6 +565,15 @@ uploaded_file = st.file_uploader(
     type=['har'],
     help="Export from Chrome DevTools → Network tab → Save all as HAR"
 )
+scan_large_bodies = st.checkbox(
+    "Scan very large response bodies (over 5 MB)",
+    value=False,
+    help=(
+        "Bodies this big are usually embedded files and are skipped "
+        "for speed. Enable if a large API response holds the links."
+    ),
+    key="scan_large"
+)
 
 # ─────────────────────────────────────────────
 # FILTER SETTINGS
@@ -504,20 +643,14 @@ with col3:
     )
 
 # Parse keywords
-include_keywords = [
-    kw.strip() for kw in include_input.split('|') if kw.strip()
-]
-exclude_keywords = [
-    kw.strip() for kw in exclude_input.split('|') if kw.strip()
-]
-custom_keywords = [
-    kw.strip() for kw in custom_input.split('|') if kw.strip()
-] if custom_input.strip() else []
+include_keywords = parse_keywords(include_input)
+exclude_keywords = parse_keywords(exclude_input)
+custom_keywords = parse_keywords(custom_input)
 
 # Show active filters
 st.info(
-    f"**Active:** Include `{include_keywords}` "
-    f"{'+ Custom `' + str(custom_keywords) + '`' if custom_keywords else ''}"
+    f"**Active:** Include `{list(include_keywords)}` "
+    f"{'+ Custom `' + str(list(custom_keywords)) + '`' if custom_keywords else ''}"
     f" | Excluding `{len(exclude_keywords)}` patterns"
 )
 
@@ -527,13 +660,20 @@ st.info(
 st.markdown("---")
 
 if uploaded_file:
-    # Read HAR content
-    try:
-        har_content = uploaded_file.read().decode('utf-8')
-    except UnicodeDecodeError:
-        har_content = uploaded_file.read().decode('utf-8', errors='ignore')
-
-    file_size_mb = len(har_content) / (1024 * 1024)
+    # Raw bytes are hashable, so the parse is cached per file
+    har_bytes = uploaded_file.getvalue()
+
+    # A different upload invalidates results from the previous one.
+    # file_id is assigned per upload, so there's nothing to hash.
+    if st.session_state.har_file_id != uploaded_file.file_id:
+        st.session_state.har_file_id = uploaded_file.file_id
+        st.session_state.raw_links = []
+        st.session_state.raw_links_lower = []
+        st.session_state.cleaned_map = {}
+        st.session_state.filtered_links = []
+        st.session_state.har_loaded = False
+
+    file_size_mb = len(har_bytes) / (1024 * 1024)
     st.caption(
         f"📁 File: {uploaded_file.name} | "
         f"Size: {file_size_mb:.1f} MB"
@@ -544,15 +684,24 @@ if uploaded_file:
     ):
         with st.spinner("Parsing HAR file and extracting URLs..."):
             # Step 1: Get all URLs
-            raw_urls = extract_all_urls_from_har(har_content)
+            raw_urls = extract_all_urls_from_har(
+                har_bytes, scan_large_bodies
+            )
             st.session_state.raw_links = raw_urls
+            st.session_state.raw_links_lower = [
+                u.lower() for u in raw_urls
+            ]
+            st.session_state.cleaned_map = dict(
+                zip(raw_urls, clean_urls(raw_urls))
+            )
 
             # Step 2: Filter
             filtered = filter_urls(
                 raw_urls,
                 include_keywords,
                 exclude_keywords,
-                custom_keywords
+                custom_keywords,
+                st.session_state.cleaned_map
             )
             st.session_state.filtered_links = filtered
             st.session_state.har_loaded = True
@@ -582,7 +731,8 @@ if st.session_state.har_loaded and st.session_state.filtered_links:
             st.session_state.raw_links,
             include_keywords,
             exclude_keywords,
-            custom_keywords
+            custom_keywords,
+            st.session_state.cleaned_map
         )
         st.session_state.filtered_links = filtered
         st.rerun()
@@ -590,10 +740,9 @@ if st.session_state.har_loaded and st.session_state.filtered_links:
     # ── DISPLAY RESULTS ──
     st.markdown("### Clean PDF Links:")
 
-    for i, (url, keyword) in enumerate(
+    for i, (url, keyword, filename) in enumerate(
         st.session_state.filtered_links, 1
     ):
-        filename = url.split('/')[-1].split('?')[0]
         if len(filename) > 80:
             filename = filename[:77] + "..."
 
@@ -619,7 +768,7 @@ if st.session_state.har_loaded and st.session_state.filtered_links:
     # Option 1: Plain URL list
     with d1:
         plain_urls = "\n".join(
-            url for url, _ in st.session_state.filtered_links
+            url for url, _, _ in st.session_state.filtered_links
         )
         st.download_button(
             "📝 URLs Only (.txt)",
@@ -655,16 +804,16 @@ if st.session_state.har_loaded and st.session_state.filtered_links:
 
     # Option 3: CSV format
     with d3:
-        csv_lines = ["index,filename,url,matched_keyword"]
-        for i, (url, kw) in enumerate(
+        csv_buf = io.StringIO()
+        csv_buf.write("index,filename,url,matched_keyword")
+        for i, (url, kw, fname) in enumerate(
             st.session_state.filtered_links, 1
         ):
-            fname = url.split('/')[-1].split('?')[0]
             # Escape commas in filename
             fname = fname.replace(',', '_')
-            csv_lines.append(f'{i},"{fname}","{url}","{kw}"')
+            csv_buf.write(f'\n{i},"{fname}","{url}","{kw}"')
 
-        csv_data = "\n".join(csv_lines)
+        csv_data = csv_buf.getvalue()
         st.download_button(
             "📊 CSV Format (.csv)",
             data=csv_data,
@@ -683,7 +832,7 @@ if st.session_state.har_loaded and st.session_state.filtered_links:
     st.subheader("📋 Copy-Paste Ready")
 
     plain_text = "\n".join(
-        url for url, _ in st.session_state.filtered_links
+        url for url, _, _ in st.session_state.filtered_links
     )
     st.text_area(
         "All PDF URLs (select all → copy)",
@@ -695,7 +844,19 @@ if st.session_state.har_loaded and st.session_state.filtered_links:
 # ─────────────────────────────────────────────
 # DEBUG: RAW LINKS
 # ─────────────────────────────────────────────
-if st.session_state.har_loaded and st.session_state.raw_links:
+# st.fragment (Streamlit 1.37+, experimental_fragment before that)
+# reruns only the decorated function when one of its widgets
+# changes, so typing in the search box doesn't rerun the whole app
+_fragment = (
+    getattr(st, 'fragment', None)
+    or getattr(st, 'experimental_fragment', None)
+    or (lambda func: func)
+)
+
+
+@_fragment
+def debug_panel():
+    """Searchable list of the raw URLs pulled from the HAR"""
     with st.expander(
         f"🔧 Debug: All {len(st.session_state.raw_links)} "
         f"raw URLs from HAR"
@@ -713,23 +874,32 @@ if st.session_state.har_loaded and st.session_state.raw_links:
 
         filtered_raw = st.session_state.raw_links
         if search_term:
+            term = search_term.lower()
             filtered_raw = [
-                u for u in st.session_state.raw_links
-                if search_term.lower() in u.lower()
+                u for u, u_lower in zip(
+                    st.session_state.raw_links,
+                    st.session_state.raw_links_lower
+                )
+                if term in u_lower
             ]
             st.caption(
                 f"Showing {len(filtered_raw)} URLs "
                 f"matching '{search_term}'"
             )
 
+        cleaned_map = st.session_state.cleaned_map
         for i, url in enumerate(filtered_raw[:500], 1):
-            cleaned = clean_url(url)
+            cleaned = cleaned_map[url]
             if cleaned:
                 is_pdf = '.pdf' in cleaned.lower()
                 icon = "📄" if is_pdf else "🔗"
                 st.text(f"{icon} {i}. {cleaned[:150]}")
 
 
+if st.session_state.har_loaded and st.session_state.raw_links:
+    debug_panel()
+
+
 # ─────────────────────────────────────────────
 # SIDEBAR
 # ─────────────────────────────────────────────